@@ -0,0 +1,125 @@
+import ipaddress
+from array import array
+from app.models.trie import ADDRESS_BITS, IPTrie
+from app.utils.logging_config import logger
+
+# Bits consumed at each level of the table, per address family
+STRIDES = {
+    4: (16, 8, 8),
+    6: (16,) + (8,) * 14,
+}
+
+POINTER = 0x80000000  # Slot flag: the rest of the slot is the offset of a child chunk
+OFFSET_MASK = POINTER - 1
+
+
+class CompiledTrie:
+    """Read-only multibit-stride lookup table (DIR-24-8 style) compiled from an IPTrie.
+
+    Each address family is one flat `array('I')`: a root chunk of
+    `2**strides[0]` slots followed by child chunks of `2**stride` slots.
+    A slot holds either a match-set id (0 means no match) or `POINTER` plus
+    the offset of the chunk that resolves the next stride.
+    """
+
+    __slots__ = ("tables", "strides", "match_sets", "_levels")
+
+    def __init__(self, tables, match_sets, strides=STRIDES):
+        self.tables = {version: memoryview(table).toreadonly() for version, table in tables.items()}
+        self.strides = strides
+        self.match_sets = tuple(match_sets)
+        self._levels = {}
+        for version, family_strides in strides.items():
+            # (shift, mask) used to extract each level's index from an address
+            shift = ADDRESS_BITS[version]
+            levels = []
+            for stride in family_strides:
+                shift -= stride
+                levels.append((shift, (1 << stride) - 1))
+            self._levels[version] = tuple(levels)
+
+    @classmethod
+    def compile(cls, trie: IPTrie, strides=STRIDES):
+        """Build the flat tables from every prefix stored in `trie`."""
+        match_sets = [()]  # id 0: no match
+        tables = {}
+
+        for version, root in trie.roots.items():
+            width = ADDRESS_BITS[version]
+            if sum(strides[version]) != width:
+                raise ValueError(f"IPv{version} strides must add up to {width} bits")
+
+            # Collect (length, key, match-set id); a node's match set includes its ancestors'
+            prefixes = []
+            stack = [(root, ())]
+            while stack:
+                node, inherited = stack.pop()
+                if node.data:
+                    inherited = inherited + tuple(node.data)
+                    match_sets.append(inherited)
+                    prefixes.append((node.length, node.key, len(match_sets) - 1))
+                stack.extend((child, inherited) for child in node.children if child)
+
+            # Shorter prefixes first so longer ones overwrite the slots they cover
+            prefixes.sort(key=lambda prefix: prefix[0])
+            tables[version] = cls._build_table(prefixes, width, strides[version])
+
+        compiled = cls(tables, match_sets, strides)
+        logger.info(
+            f"Compiled trie: {len(match_sets) - 1} match sets, "
+            f"{sum(len(table) for table in tables.values())} slots."
+        )
+        return compiled
+
+    @staticmethod
+    def _build_table(prefixes, width, strides):
+        """Expand prefixes into the root chunk and child chunks of one family."""
+        table = array("I", [0]) * (1 << strides[0])
+
+        for length, key, set_id in prefixes:
+            base = 0
+            end_bit = 0
+            for level, stride in enumerate(strides):
+                end_bit += stride
+                index = base + ((key >> (width - end_bit)) & ((1 << stride) - 1))
+
+                if length <= end_bit:
+                    # Prefix ends within this level: fill every slot it covers
+                    span = 1 << (end_bit - length)
+                    table[index : index + span] = array("I", [set_id]) * span
+                    break
+
+                slot = table[index]
+                if not slot & POINTER:
+                    # Push the current answer down into a new child chunk
+                    chunk = len(table)
+                    if chunk > OFFSET_MASK:
+                        raise OverflowError("Compiled table exceeds 2**31 slots")
+                    table.extend(array("I", [slot]) * (1 << strides[level + 1]))
+                    slot = table[index] = POINTER | chunk
+                base = slot & OFFSET_MASK
+
+        return table
+
+    def search(self, ip: str):
+        """Find all matching subnets for an IP address, same result as `IPTrie.search`."""
+        ip_addr = ipaddress.ip_address(ip)
+        return self.search_int(int(ip_addr), ip_addr.version)
+
+    def search_int(self, value: int, version: int):
+        """Find all matching subnets for an integer-encoded address."""
+        set_id = self.match_set_id(value, version)
+        return list(self.match_sets[set_id]) if set_id else None
+
+    def match_set_id(self, value: int, version: int) -> int:
+        """Resolve an address to the id of its match set (0 when nothing matches)."""
+        table = self.tables[version]
+        levels = self._levels[version]
+        shift, mask = levels[0]
+        slot = table[value >> shift]
+        level = 1
+        while slot & POINTER:
+            shift, mask = levels[level]
+            slot = table[(slot & OFFSET_MASK) + ((value >> shift) & mask)]
+            level += 1
+        return slot
@@ -0,0 +1,109 @@
+import numpy as np
+from app.models.trie import ADDRESS_BITS, IPTrie
+from app.utils.ip_parsing import parse_ip
+from app.utils.logging_config import logger
+
+# IPv6 addresses are compared as (high, low) 64-bit words
+IPV6_DTYPE = np.dtype([("hi", np.uint64), ("lo", np.uint64)])
+LOW_WORD = (1 << 64) - 1
+
+
+class IntervalTable:
+    """Prefix set flattened into sorted, disjoint address intervals for vectorized lookups.
+
+    Interval `i` of a family covers `[starts[i], starts[i + 1])` and resolves to
+    `match_sets[set_ids[i]]` (id 0 means no match), so a whole batch is answered
+    with one `numpy.searchsorted` per family.
+    """
+
+    __slots__ = ("starts", "set_ids", "match_sets")
+
+    def __init__(self, starts, set_ids, match_sets):
+        self.starts = starts
+        self.set_ids = set_ids
+        self.match_sets = tuple(match_sets)
+
+    @classmethod
+    def build(cls, trie: IPTrie):
+        """Flatten every prefix stored in `trie` into intervals."""
+        match_sets = [()]  # id 0: no match
+        starts = {}
+        set_ids = {}
+
+        for version, root in trie.roots.items():
+            width = ADDRESS_BITS[version]
+            bounds = []  # (start, set id) in ascending start order
+            cls._flatten(root, width, (), 0, match_sets, bounds)
+
+            # Keep the innermost interval for each start and merge equal neighbours
+            family_starts, family_ids = [], []
+            for start, set_id in bounds:
+                if family_starts and family_starts[-1] == start:
+                    family_starts.pop()
+                    family_ids.pop()
+                if family_ids and family_ids[-1] == set_id:
+                    continue
+                family_starts.append(start)
+                family_ids.append(set_id)
+
+            starts[version] = cls._encode(family_starts, version)
+            set_ids[version] = np.array(family_ids, dtype=np.uint32)
+
+        table = cls(starts, set_ids, match_sets)
+        logger.info(
+            f"Interval table built: {sum(len(ids) for ids in set_ids.values())} intervals, "
+            f"{len(match_sets) - 1} match sets."
+        )
+        return table
+
+    @classmethod
+    def _flatten(cls, node, width, inherited, set_id, match_sets, bounds):
+        """Emit the intervals of `node`'s range, recursing into its children in address order."""
+        if node.data:
+            inherited = inherited + tuple(node.data)
+            match_sets.append(inherited)
+            set_id = len(match_sets) - 1
+
+        bounds.append((node.key, set_id))
+        for child in node.children:
+            if child is None:
+                continue
+            cls._flatten(child, width, inherited, set_id, match_sets, bounds)
+            end = child.key + (1 << (width - child.length))
+            if end < 1 << width:
+                bounds.append((end, set_id))  # Back to this node's answer after the child
+
+    @staticmethod
+    def _encode(values, version):
+        """Integer addresses as a sortable NumPy array for the given family."""
+        if version == 4:
+            return np.array(values, dtype=np.uint64)
+        encoded = np.empty(len(values), dtype=IPV6_DTYPE)
+        encoded["hi"] = [value >> 64 for value in values]
+        encoded["lo"] = [value & LOW_WORD for value in values]
+        return encoded
+
+    def lookup_ids(self, values, version):
+        """Vectorized match-set ids for integer-encoded addresses of one family."""
+        if not values:
+            return np.empty(0, dtype=np.uint32)
+        index = np.searchsorted(self.starts[version], self._encode(values, version), side="right")
+        return self.set_ids[version][index - 1]
+
+    def batch_search(self, ip_list):
+        """Resolve a list of IP strings; same per-IP results as `IPTrie.search`."""
+        positions = {4: [], 6: []}
+        values = {4: [], 6: []}
+        for position, ip in enumerate(ip_list):
+            version, value = parse_ip(ip)
+            positions[version].append(position)
+            values[version].append(value)
+
+        results = [None] * len(ip_list)
+        match_sets = self.match_sets
+        for version in positions:
+            ids = self.lookup_ids(values[version], version).tolist()
+            for position, set_id in zip(positions[version], ids):
+                if set_id:
+                    results[position] = list(match_sets[set_id])
+        return results
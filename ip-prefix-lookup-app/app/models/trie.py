@@ -1,61 +1,56 @@
 import ipaddress
 from app.utils.logging_config import logger
 
+# Key width in bits for each address family
+ADDRESS_BITS = {4: 32, 6: 128}
+
 
 class TrieNode:
-    """Compressed Radix Trie Node"""
+    """Compressed Radix Trie Node keyed by an integer network address."""
 
-    __slots__ = ("prefix", "children", "data")
+    __slots__ = ("key", "length", "children", "data", "owner")
 
-    def __init__(self, prefix=""):
-        self.prefix = prefix  # Compressed prefix
-        self.children = {}
+    def __init__(self, key=0, length=0, owner=None):
+        self.key = key  # Network address as an integer (host bits zeroed)
+        self.length = length  # Prefix length in bits
+        self.children = [None, None]  # Branches selected by the next bit
         self.data = []  # Stores multiple subnet matches
+        self.owner = owner  # Token of the trie allowed to modify this node in place
 
 
 class IPTrie:
-    """Compressed Radix Trie for IP Prefix Matching."""
+    """Compressed Radix Trie for IP Prefix Matching.
+
+    IPv4 and IPv6 prefixes live under separate roots and are stored as
+    fixed-width integers, so every step of a walk is a shift and a bit test.
 
-    __slots__ = ("root", "node_count")
+    `fork()` returns a copy that shares every node with the original; the
+    fork copies a node only when it has to modify it, so the original is
+    never changed and can keep serving lookups.
+    """
+
+    __slots__ = ("roots", "node_count", "_token")
 
     def __init__(self):
-        self.root = TrieNode()
-        self.node_count = 1  # Start with root node
+        self._token = object()
+        self.roots = {version: TrieNode(owner=self._token) for version in ADDRESS_BITS}
+        self.node_count = len(self.roots)  # Start with one root per family
         logger.info("Trie initialized.")
 
+    def fork(self):
+        """Return a trie that shares all nodes with this one and copies them on write."""
+        forked = IPTrie.__new__(IPTrie)
+        forked._token = object()
+        forked.roots = dict(self.roots)
+        forked.node_count = self.node_count
+        return forked
+
     def insert(self, subnet: str, provider: str, tags: list):
         """Insert an IP subnet into the compressed radix trie and track node count."""
         network = ipaddress.ip_network(subnet, strict=False)
-        binary_prefix = self._get_network_bits(network)
-        node = self.root
-
-        while binary_prefix:
-            for existing_prefix, child in node.children.items():
-                common_prefix = self._find_common_prefix(binary_prefix, existing_prefix)
-
-                if common_prefix:
-                    if common_prefix == existing_prefix:
-                        node = child
-                        binary_prefix = binary_prefix[len(common_prefix) :]
-                        break
-                    else:
-                        # Partial match, split the node
-                        new_child = TrieNode(common_prefix)
-                        new_child.children[
-                            existing_prefix[len(common_prefix) :]
-                        ] = child
-                        node.children[common_prefix] = new_child
-                        del node.children[existing_prefix]
-                        node = new_child
-                        binary_prefix = binary_prefix[len(common_prefix) :]
-                        self.node_count += 1
-                        break
-            else:
-                # No match, insert new compressed path
-                node.children[binary_prefix] = TrieNode(binary_prefix)
-                node = node.children[binary_prefix]
-                self.node_count += 1
-                break
+        node = self._insert_node(
+            network.version, int(network.network_address), network.prefixlen
+        )
 
         # Store data as a dictionary instead of tuple
         node.data.append(
@@ -72,36 +67,158 @@ class IPTrie:
     def search(self, ip: str):
         """Find all matching subnets for an IP address and return as a dictionary list."""
         ip_addr = ipaddress.ip_address(ip)
-        binary_ip = self._get_ip_bits(ip_addr)
-        node = self.root
-        matches = []
-
-        while binary_ip:
-            for prefix, child in node.children.items():
-                if binary_ip.startswith(prefix):
-                    node = child
-                    binary_ip = binary_ip[len(prefix) :]
-                    if node.data:
-                        matches.extend(node.data)  # Collect matching subnets
-                    break
-            else:
+        matches = self.search_int(int(ip_addr), ip_addr.version)
+
+        logger.info(f"Search for {ip}: {len(matches) if matches else 0} matches found.")
+        return matches
+
+    def search_int(self, value: int, version: int):
+        """Find all matching subnets for an integer-encoded address."""
+        width = ADDRESS_BITS[version]
+        node = self.roots[version]
+        matches = list(node.data)
+
+        while node.length < width:
+            child = node.children[(value >> (width - 1 - node.length)) & 1]
+            if child is None or (value ^ child.key) >> (width - child.length):
                 break  # No more matches
+            node = child
+            if node.data:
+                matches.extend(node.data)  # Collect matching subnets
 
-        logger.info(f"Search for {ip}: {len(matches)} matches found.")
         return matches if matches else None
 
-    def _get_network_bits(self, network):
-        """Convert a network into a binary bit sequence (IP + Prefix length)."""
-        return f"{int(network.network_address):032b}"[: network.prefixlen]
-
-    def _get_ip_bits(self, ip_addr):
-        """Convert an IP address into a binary bit sequence."""
-        return f"{int(ip_addr):032b}"
-
-    def _find_common_prefix(self, a, b):
-        """Find the common prefix between two binary strings."""
-        length = min(len(a), len(b))
-        for i in range(length):
-            if a[i] != b[i]:
-                return a[:i]
-        return a[:length]
+    def _insert_node(self, version, key, length):
+        """Return the node for `key/length`, creating or splitting nodes as needed."""
+        width = ADDRESS_BITS[version]
+        node = self.roots[version] = self._own(self.roots[version])
+
+        while node.length < length:
+            bit = (key >> (width - 1 - node.length)) & 1
+            child = node.children[bit]
+
+            if child is None:
+                # No match, insert new compressed path
+                child = node.children[bit] = TrieNode(key, length, self._token)
+                self.node_count += 1
+                return child
+
+            common = self._common_length(key, child.key, width, min(length, child.length))
+            if common == child.length:
+                child = self._own(child)
+                node.children[bit] = child
+                node = child
+                continue
+
+            # Partial match, split the edge at the first differing bit
+            if common == length:
+                branch = TrieNode(key, length, self._token)
+            else:
+                branch = TrieNode(key & ~((1 << (width - common)) - 1), common, self._token)
+            branch.children[(child.key >> (width - 1 - common)) & 1] = child
+            node.children[bit] = branch
+            self.node_count += 1
+            node = branch
+
+        return node
+
+    def delete(self, subnet: str, provider: str = None, tags: list = None):
+        """Remove the records stored for `subnet`, optionally only those of `provider` (and `tags`).
+
+        Records are matched on the subnet string as inserted, so other
+        spellings of the same network (e.g. `10.0.0.1/8`) are left alone.
+
+        Nodes left without data are pruned or merged into their only child so
+        the trie stays fully compressed. Returns the number of records removed.
+        """
+        network = ipaddress.ip_network(subnet, strict=False)
+        wanted_tags = None if tags is None else list(tags)
+
+        def matches(record):
+            return (
+                record["subnet"] == subnet
+                and (provider is None or record["provider"] == provider)
+                and (wanted_tags is None or record["tags"] == wanted_tags)
+            )
+
+        removed = self._delete_records(
+            network.version, int(network.network_address), network.prefixlen, matches
+        )
+        if removed:
+            logger.info(
+                f"Deleted {removed} record(s) for {subnet} (Provider: {provider}). Total Nodes: {self.node_count}"
+            )
+        return removed
+
+    def remove_provider(self, provider: str):
+        """Remove every record of `provider`. Returns the number of records removed."""
+        targets = []
+        for version, root in self.roots.items():
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                if any(record["provider"] == provider for record in node.data):
+                    targets.append((version, node.key, node.length))
+                stack.extend(child for child in node.children if child)
+
+        removed = sum(
+            self._delete_records(version, key, length, lambda record: record["provider"] == provider)
+            for version, key, length in targets
+        )
+        logger.info(f"Removed provider {provider}: {removed} record(s). Total Nodes: {self.node_count}")
+        return removed
+
+    def _delete_records(self, version, key, length, matches):
+        """Drop matching records at exactly `key/length`, then prune the emptied path."""
+        width = ADDRESS_BITS[version]
+
+        # Read-only walk first so a miss never copies nodes of a forked trie
+        node = self.roots[version]
+        while node is not None and node.length < length:
+            node = node.children[(key >> (width - 1 - node.length)) & 1]
+            if node is not None and (node.length > length or (key ^ node.key) >> (width - node.length)):
+                node = None
+        if node is None or node.length != length or not any(map(matches, node.data)):
+            return 0
+
+        # Copy the path down to the node, remembering (parent, bit) pairs
+        node = self.roots[version] = self._own(self.roots[version])
+        path = []
+        while node.length < length:
+            bit = (key >> (width - 1 - node.length)) & 1
+            path.append((node, bit))
+            child = self._own(node.children[bit])
+            node.children[bit] = child
+            node = child
+
+        kept = [record for record in node.data if not matches(record)]
+        removed = len(node.data) - len(kept)
+        node.data = kept
+
+        # Prune data-less nodes with no children, merge those with a single child
+        while path and not node.data:
+            parent, bit = path.pop()
+            children = [child for child in node.children if child]
+            if len(children) > 1:
+                break
+            parent.children[bit] = children[0] if children else None
+            self.node_count -= 1
+            if children:
+                break
+            node = parent
+
+        return removed
+
+    def _own(self, node):
+        """Return `node` if this trie may modify it, otherwise a private copy."""
+        if node.owner is self._token:
+            return node
+        copy = TrieNode(node.key, node.length, self._token)
+        copy.children = list(node.children)
+        copy.data = list(node.data)
+        return copy
+
+    @staticmethod
+    def _common_length(a, b, width, limit):
+        """Number of leading bits shared by two keys, capped at `limit`."""
+        return min(width - (a ^ b).bit_length(), limit)
@@ -1,3 +1,4 @@
+from typing import Literal
 from fastapi import APIRouter, HTTPException
 from app.services.trie_manager import TrieManager
 from app.utils.logging_config import logger
@@ -5,20 +6,29 @@ from app.utils.logging_config import logger
 router = APIRouter(prefix="/api/v1/reload", tags=["Prefix reload"])
 
 @router.post("/")
-def reload_prefixes():
+def reload_prefixes(mode: Literal["full", "delta"] = "full"):
     """
     Endpoint to manually reload the Trie from `prefixes.json`.
 
     This function:
     - Reads the latest `prefixes.json` file.
-    - Updates the Compressed Radix Trie with new prefix data.
+    - `mode=full` (default): builds a fresh Compressed Radix Trie.
+    - `mode=delta`: diffs the file against the loaded prefixes and applies
+      only the added and removed ones; the response reports the diff sizes.
+    - Publishes the result atomically; lookups in flight keep using the
+      previous generation.
     - Logs every reload request for tracking.
 
     Returns:
         JSON response confirming successful reload or an error message.
     """
     try:
-        logger.info("Reload request received. Reloading Trie from prefixes.json...")
+        logger.info(f"Reload request received ({mode}). Reloading Trie from prefixes.json...")
+
+        if mode == "delta":
+            diff = TrieManager.apply_delta()
+            logger.info(f"Trie reloaded successfully: {diff}")
+            return {"message": "Trie reloaded successfully", "diff": diff}
 
         # Call TrieManager to reinitialize the Trie from the latest `prefixes.json`
         TrieManager.initialize_trie()
@@ -6,8 +6,11 @@ from app.utils.logging_config import logger
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), "../../data/prefixes.json")
 
-def load_prefixes(trie: IPTrie, filename=DATA_FILE):
-    """Load prefixes into Trie and log load time & node count."""
+def read_prefixes(filename=DATA_FILE):
+    """Read `(subnet, provider, tags)` records from a prefixes file.
+
+    Returns None if the file is missing or not valid JSON.
+    """
     try:
         with open(filename, "r") as f:
             data = json.load(f)
@@ -15,20 +18,33 @@ def load_prefixes(trie: IPTrie, filename=DATA_FILE):
         logger.error(
             f"Failed to load {filename}. Ensure it exists and is valid JSON."
         )
-        return
+        return None
+
+    return [
+        (subnet, provider, tuple(entry.get("tags", [])))
+        for provider, entries in data.items()
+        for entry in entries
+        for subnet in entry.get("prefixes", [])
+    ]
+
+def load_prefixes(trie: IPTrie, filename=DATA_FILE):
+    """Load prefixes into Trie and log load time & node count.
+
+    Returns the list of records inserted, or None if the file could not be read.
+    """
+    records = read_prefixes(filename)
+    if records is None:
+        return None
 
-    prefix_count = 0
     start_time = time.time()
 
-    for provider, entries in data.items():
-        for entry in entries:
-            for subnet in entry.get("prefixes", []):
-                trie.insert(subnet, provider, entry.get("tags", []))
-                prefix_count += 1
+    for subnet, provider, tags in records:
+        trie.insert(subnet, provider, tags)
 
     elapsed_time = time.time() - start_time
 
     logger.info(
-        f"Loaded {prefix_count} subnets into Trie from {filename} in {elapsed_time:.2f} seconds."
+        f"Loaded {len(records)} subnets into Trie from {filename} in {elapsed_time:.2f} seconds."
     )
     logger.info(f"Total Trie Nodes: {trie.node_count}")
+    return records
@@ -1,31 +1,124 @@
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor
+from app.models.compiled import CompiledTrie
+from app.models.interval_table import IntervalTable
 from app.models.trie import IPTrie
-from app.services.data_loader import load_prefixes
+from app.services.data_loader import DATA_FILE, load_prefixes, read_prefixes
+from app.utils.config import BATCH_VECTOR_THRESHOLD, LOOKUP_ENGINE
 import threading
 
+ENGINES = ("trie", "compiled")
+
+
+class PrefixGeneration:
+    """One fully built, never modified dataset served by TrieManager.
+
+    A generation bundles the trie with every structure derived from it, so a
+    reader that grabs `TrieManager._generation` once sees a consistent view
+    for the whole request, even if a reload publishes a newer one meanwhile.
+    """
+
+    __slots__ = ("number", "trie", "records", "engine_name", "engine", "intervals")
+
+    def __init__(self, number, trie, records=(), engine="trie"):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown lookup engine {engine!r}; expected one of {ENGINES}")
+        self.number = number
+        self.trie = trie
+        self.records = Counter(records)  # (subnet, provider, tags) -> occurrences
+        self.engine_name = engine
+        self.engine = CompiledTrie.compile(trie) if engine == "compiled" else trie
+        self.intervals = IntervalTable.build(trie)  # Vectorized engine for large batches
+
+
 class TrieManager:
-    """Manages the global Trie for efficient IP prefix lookups."""
+    """Manages the global Trie for efficient IP prefix lookups.
 
-    _trie = IPTrie()
-    _lock = threading.Lock()
+    Reads never lock: they use whatever generation is published at the time.
+    Reloads build a new generation off to the side and publish it with a
+    single reference assignment; the previous one is freed once the last
+    request using it finishes.
+    """
+
+    _generation = PrefixGeneration(0, IPTrie())
+    _reload_lock = threading.Lock()  # Serializes reloads only
     _executor = ThreadPoolExecutor(max_workers=10)  # Parallel execution for batch lookups
 
     @classmethod
-    def initialize_trie(cls):
-        """Initializes the Trie from `prefixes.json`."""
-        print("🔄 Loading IP Prefixes into Trie...")
-        load_prefixes(cls._trie)
-        print(f"✅ Trie Initialized with {cls._trie.node_count} nodes.")
+    def initialize_trie(cls, engine=LOOKUP_ENGINE):
+        """Builds a new generation from `prefixes.json` and publishes it."""
+        with cls._reload_lock:
+            print("🔄 Loading IP Prefixes into Trie...")
+            trie = IPTrie()
+            records = load_prefixes(trie)
+            if records is None and cls._generation.number > 0:
+                raise RuntimeError(
+                    f"Failed to load prefixes; still serving generation {cls._generation.number}"
+                )
+            generation = PrefixGeneration(cls._generation.number + 1, trie, records or (), engine)
+            cls._generation = generation  # Atomic publish
+            print(
+                f"✅ Trie Initialized with {trie.node_count} nodes "
+                f"({engine} engine, generation {generation.number})."
+            )
+
+    @classmethod
+    def apply_delta(cls, filename=DATA_FILE):
+        """Reloads `prefixes.json` by applying only the records that changed.
+
+        The new file is diffed against the records of the current generation;
+        removed and added records are applied to a fork of the current trie,
+        which shares all untouched nodes with it, and published as a new
+        generation. Returns the diff sizes.
+        """
+        with cls._reload_lock:
+            current = cls._generation
+            records = read_prefixes(filename)
+            if records is None:
+                raise RuntimeError(
+                    f"Failed to load prefixes; still serving generation {current.number}"
+                )
+
+            new_records = Counter(records)
+            added = new_records - current.records
+            removed = current.records - new_records
+
+            trie = current.trie.fork()
+            for subnet, provider, tags in removed.keys() | added.keys():
+                # Replace every copy of a changed record with its new occurrences
+                trie.delete(subnet, provider, tags)
+                for _ in range(new_records[(subnet, provider, tags)]):
+                    trie.insert(subnet, provider, tags)
+
+            cls._generation = PrefixGeneration(
+                current.number + 1, trie, new_records, current.engine_name
+            )
+            diff = {
+                "added": sum(added.values()),
+                "removed": sum(removed.values()),
+                "unchanged": sum((new_records & current.records).values()),
+            }
+            print(f"✅ Delta reload applied ({diff}), generation {current.number + 1}.")
+            return diff
+
+    @classmethod
+    def current(cls):
+        """Returns the generation currently being served."""
+        return cls._generation
 
     @classmethod
     def lookup(cls, ip_address):
         """Performs a lookup for a single IP address."""
-        with cls._lock:
-            return cls._trie.search(ip_address)
+        return cls._generation.engine.search(ip_address)
 
     @classmethod
     def batch_lookup(cls, ip_list):
-        """Performs batch lookup for a list of IPs using parallel processing."""
-        with cls._lock:
-            results = list(cls._executor.map(cls._trie.search, ip_list))
-        return results
+        """Performs batch lookup for a list of IPs against a single generation.
+
+        Large batches are resolved in one vectorized pass over the interval
+        table; small ones go through the lookup engine in parallel.
+        """
+        generation = cls._generation
+        if len(ip_list) >= BATCH_VECTOR_THRESHOLD:
+            return generation.intervals.batch_search(ip_list)
+        return list(cls._executor.map(generation.engine.search, ip_list))
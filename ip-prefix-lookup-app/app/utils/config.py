@@ -0,0 +1,7 @@
+import os
+
+# Lookup engine served by TrieManager: "trie" (IPTrie) or "compiled" (CompiledTrie)
+LOOKUP_ENGINE = os.getenv("LOOKUP_ENGINE", "trie").lower()
+
+# Batches with at least this many IPs are resolved by the vectorized IntervalTable
+BATCH_VECTOR_THRESHOLD = int(os.getenv("BATCH_VECTOR_THRESHOLD", "64"))
@@ -0,0 +1,18 @@
+import ipaddress
+import socket
+
+
+def parse_ip(text: str):
+    """Parse an IPv4/IPv6 address string into `(version, integer value)`.
+
+    Uses `socket.inet_pton` for the common case and falls back to
+    `ipaddress` for forms it does not accept (e.g. scoped IPv6 addresses).
+    Raises `ValueError` for invalid input, like `ipaddress.ip_address`.
+    """
+    try:
+        if ":" in text:
+            return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, text), "big")
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, text), "big")
+    except (OSError, TypeError):
+        ip_addr = ipaddress.ip_address(text)
+        return ip_addr.version, int(ip_addr)
@@ -2,6 +2,10 @@ import time
 import psutil
 import json
 import ipaddress
+import logging
+import os
+from app.models.compiled import CompiledTrie
+from app.models.interval_table import IntervalTable
 from app.models.trie import IPTrie
 from app.services.data_loader import load_prefixes
 
@@ -49,6 +53,49 @@ multi_match_ips = [
     "184.51.33.230",  # Another example of a multi-subnet match
 ]
 
+
+class StringTrie:
+    """Previous binary-string radix trie, kept as the baseline for Benchmark 4."""
+
+    def __init__(self):
+        self.root = {"children": {}, "data": []}
+
+    def insert(self, subnet, provider, tags):
+        network = ipaddress.ip_network(subnet, strict=False)
+        binary_prefix = f"{int(network.network_address):032b}"[: network.prefixlen]
+        node = self.root
+        while binary_prefix:
+            for existing_prefix, child in node["children"].items():
+                common = os.path.commonprefix([binary_prefix, existing_prefix])
+                if common:
+                    if common != existing_prefix:
+                        split = {"children": {existing_prefix[len(common) :]: child}, "data": []}
+                        del node["children"][existing_prefix]
+                        node["children"][common] = child = split
+                    node = child
+                    binary_prefix = binary_prefix[len(common) :]
+                    break
+            else:
+                node["children"][binary_prefix] = node = {"children": {}, "data": []}
+                break
+        node["data"].append({"subnet": subnet, "provider": provider, "tags": list(tags)})
+
+    def search(self, ip):
+        binary_ip = f"{int(ipaddress.ip_address(ip)):032b}"
+        node = self.root
+        matches = []
+        while binary_ip:
+            for prefix, child in node["children"].items():
+                if binary_ip.startswith(prefix):
+                    node = child
+                    binary_ip = binary_ip[len(prefix) :]
+                    matches.extend(node["data"])
+                    break
+            else:
+                break
+        return matches if matches else None
+
+
 # Initialize Trie
 trie = IPTrie()
 
@@ -106,3 +153,86 @@ benchmark_batch_lookup(trie, sample_ipv4_ips, "IPv4 Batch Lookup (Found)")
 benchmark_batch_lookup(trie, sample_ipv6_ips, "IPv6 Batch Lookup (Found)")
 benchmark_batch_lookup(trie, not_found_ips * 10, "Batch Lookup (Not Found)")
 benchmark_batch_lookup(trie, multi_match_ips * 10, "Batch Lookup (Multi-Match)")
+
+### **Benchmark 4: Integer Trie vs. previous String Trie (logging disabled)**
+def benchmark_engines(engines, ips, label, rounds=200):
+    """Compare per-lookup cost of several engines on the same IPs"""
+    for name, engine in engines.items():
+        for ip in ips:  # Warm up
+            engine.search(ip)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for ip in ips:
+                engine.search(ip)
+        per_lookup = (time.perf_counter() - start) / (rounds * len(ips)) * 1e6
+        print(f"{label} [{name}] Avg Time: {per_lookup:.2f} µs")
+
+
+logging.disable(logging.INFO)
+string_trie = StringTrie()
+for provider, entries in data.items():
+    for entry in entries:
+        for prefix in entry["prefixes"]:
+            string_trie.insert(prefix, provider, entry.get("tags", []))
+
+engines = {"string": string_trie, "integer": trie, "compiled": CompiledTrie.compile(trie)}
+benchmark_engines(engines, sample_ipv4_ips, "IPv4 Lookup (Found)")
+benchmark_engines(engines, sample_ipv6_ips, "IPv6 Lookup (Found)")
+benchmark_engines(engines, not_found_ips, "IP Lookup (Not Found)")
+benchmark_engines(engines, multi_match_ips, "IP Lookup (Multi-Match)")
+logging.disable(logging.NOTSET)
+
+### **Benchmark 4b: 100k-IP batch, vectorized interval table vs. per-IP trie search**
+def benchmark_large_batch(trie, size=100_000, seed=7):
+    """Time one large mixed IPv4/IPv6 batch through both batch paths"""
+    import random
+
+    rng = random.Random(seed)
+    batch = [
+        str(ipaddress.IPv4Address(rng.getrandbits(32))) if rng.random() < 0.7
+        else str(ipaddress.IPv6Address(rng.getrandbits(128)))
+        for _ in range(size)
+    ]
+    batch[::10] = (sample_ipv4_ips * (size // 10))[: len(batch[::10])]  # ~10% hits
+
+    start = time.perf_counter()
+    intervals = IntervalTable.build(trie)
+    print(f"Interval Table Built in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    vectorized = intervals.batch_search(batch)
+    print(f"Batch Lookup ({size} IPs) [intervals] Time: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    per_ip = [trie.search(ip) for ip in batch]
+    print(f"Batch Lookup ({size} IPs) [per-IP trie] Time: {(time.perf_counter() - start) * 1000:.2f} ms")
+    assert vectorized == per_ip
+
+
+logging.disable(logging.INFO)
+benchmark_large_batch(trie)
+logging.disable(logging.NOTSET)
+
+### **Benchmark 5: Compiled table on a synthetic full-BGP-sized IPv4 table (BENCH_FULL_TABLE=1)**
+if os.getenv("BENCH_FULL_TABLE"):
+    import random
+
+    logging.disable(logging.INFO)
+    rng = random.Random(42)
+    bgp_trie = IPTrie()
+    start = time.perf_counter()
+    for _ in range(1_000_000):
+        length = rng.choice([24] * 6 + [8, 16, 19, 20, 21, 22, 23])
+        key = rng.getrandbits(32) >> (32 - length) << (32 - length)
+        bgp_trie.insert(f"{ipaddress.IPv4Address(key)}/{length}", "BGP", [])
+    print(f"Synthetic Trie Loaded in {time.perf_counter() - start:.2f} seconds ({bgp_trie.node_count} nodes)")
+
+    start = time.perf_counter()
+    bgp_compiled = CompiledTrie.compile(bgp_trie)
+    print(f"Compiled in {time.perf_counter() - start:.2f} seconds ({len(bgp_compiled.tables[4])} slots)")
+
+    bgp_ips = [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(20000)]
+    mismatches = sum(bgp_compiled.search(ip) != bgp_trie.search(ip) for ip in bgp_ips)
+    print(f"Compiled vs. Trie mismatches: {mismatches}")
+    benchmark_engines({"integer": bgp_trie, "compiled": bgp_compiled}, bgp_ips[:1000], "Full Table Lookup", rounds=20)
+    logging.disable(logging.NOTSET)
@@ -84,3 +84,12 @@ def test_lookup_batch_ipv6():
     request_data = {"ips": ["2001:db8::ff00:42", "2a00:1450:4009:80b::200e"]}
     response = client.post("/api/v1/lookup/batch", json=request_data)
     assert response.status_code in [200, 404]  # Should be 200 if IPv6 exists, else 404
+
+
+# Test Large Batch Lookup (vectorized interval table path)
+def test_lookup_batch_large():
+    """Test that large batches return the same results as single lookups"""
+    ips = ["184.51.33.230", "8.8.8.8", "23.79.237.45", "2600:1f14::1"] * 50
+    response = client.post("/api/v1/lookup/batch", json={"ips": ips})
+    assert response.status_code == 200
+    assert response.json()["result"] == [TrieManager.lookup(ip) for ip in ips]
@@ -0,0 +1,100 @@
+import ipaddress
+import random
+import pytest
+from app.models.compiled import CompiledTrie
+from app.models.trie import IPTrie
+from app.services.data_loader import load_prefixes
+
+
+def sample_ips(subnets, rng):
+    """Pick addresses inside, just outside and at the edges of each subnet"""
+    ips = []
+    for subnet in subnets:
+        network = ipaddress.ip_network(subnet)
+        first = int(network.network_address)
+        last = int(network.broadcast_address)
+        top = (1 << network.max_prefixlen) - 1
+        for value in (first, last, rng.randint(first, last), max(first - 1, 0), min(last + 1, top)):
+            ips.append(str(ipaddress.ip_address(value) if network.version == 4 else ipaddress.IPv6Address(value)))
+    return ips
+
+
+@pytest.fixture(scope="module")
+def bundled():
+    """Trie and compiled table built from data/prefixes.json"""
+    trie = IPTrie()
+    load_prefixes(trie)
+    return trie, CompiledTrie.compile(trie)
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    """Seeded table of nested and overlapping IPv4/IPv6 prefixes"""
+    rng = random.Random(2024)
+    trie = IPTrie()
+    subnets = []
+    for _ in range(20000):
+        if rng.random() < 0.8:
+            length = rng.choice([8, 12, 16, 19, 20, 22, 23, 24, 24, 24, 28, 32])
+            network = ipaddress.IPv4Network((rng.getrandbits(32) >> (32 - length) << (32 - length), length))
+        else:
+            length = rng.choice([20, 29, 32, 36, 44, 48, 48, 56, 64, 128])
+            network = ipaddress.IPv6Network((rng.getrandbits(128) >> (128 - length) << (128 - length), length))
+        subnets.append(str(network))
+        trie.insert(str(network), rng.choice(["AWS", "Azure", "Fastly"]), ["Cloud"])
+    return trie, CompiledTrie.compile(trie), subnets
+
+
+def test_compiled_matches_trie_on_bundled_data(bundled):
+    """Compiled table answers exactly like IPTrie.search on prefixes.json"""
+    trie, compiled = bundled
+    ips = ["8.8.8.8", "203.0.113.255", "fd00::abcd", "0.0.0.0", "255.255.255.255", "::"]
+    ips += ["184.51.33.230", "23.79.237.45", "2600:1f14::1"]
+    for ip in ips:
+        assert compiled.search(ip) == trie.search(ip), ip
+
+
+def test_compiled_matches_trie_on_synthetic_table(synthetic):
+    """Compiled table agrees with IPTrie on nested, overlapping and host prefixes"""
+    trie, compiled, subnets = synthetic
+    for ip in sample_ips(random.Random(7).sample(subnets, 3000), random.Random(8)):
+        assert compiled.search(ip) == trie.search(ip), ip
+
+
+def test_compiled_default_route_and_host_route():
+    """/0 fills the whole root chunk, /32 descends every level"""
+    trie = IPTrie()
+    trie.insert("0.0.0.0/0", "Default", [])
+    trie.insert("10.1.2.3/32", "Host", [])
+    compiled = CompiledTrie.compile(trie)
+    assert [r["provider"] for r in compiled.search("10.1.2.3")] == ["Default", "Host"]
+    assert [r["provider"] for r in compiled.search("10.1.2.4")] == ["Default"]
+    assert compiled.search("::1") is None
+
+
+def test_compiled_table_is_read_only(bundled):
+    """Compiled tables cannot be modified after the build"""
+    _, compiled = bundled
+    with pytest.raises(TypeError):
+        compiled.tables[4][0] = 1
+
+
+def test_compiled_rejects_bad_strides():
+    """Strides must cover the full address width"""
+    with pytest.raises(ValueError):
+        CompiledTrie.compile(IPTrie(), strides={4: (16, 8), 6: (128,)})
+
+
+def test_manager_serves_compiled_engine():
+    """TrieManager answers from the compiled table when configured to"""
+    from app.services.trie_manager import TrieManager
+
+    try:
+        TrieManager.initialize_trie(engine="compiled")
+        assert isinstance(TrieManager.current().engine, CompiledTrie)
+        assert TrieManager.lookup("184.51.33.230") == TrieManager.current().trie.search("184.51.33.230")
+        assert TrieManager.lookup("8.8.8.8") is None
+        with pytest.raises(ValueError):
+            TrieManager.initialize_trie(engine="bogus")
+    finally:
+        TrieManager.initialize_trie(engine="trie")
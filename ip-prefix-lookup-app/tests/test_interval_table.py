@@ -0,0 +1,61 @@
+import ipaddress
+import random
+import pytest
+from app.models.interval_table import IntervalTable
+from app.models.trie import IPTrie
+from app.services.data_loader import load_prefixes
+
+
+@pytest.fixture(scope="module")
+def bundled():
+    """Trie and interval table built from data/prefixes.json"""
+    trie = IPTrie()
+    load_prefixes(trie)
+    return trie, IntervalTable.build(trie)
+
+
+def random_ips(rng, count):
+    """Random IPv4 and IPv6 addresses, biased towards the populated IPv6 space"""
+    ips = []
+    for _ in range(count):
+        if rng.random() < 0.6:
+            ips.append(str(ipaddress.IPv4Address(rng.getrandbits(32))))
+        else:
+            ips.append(str(ipaddress.IPv6Address((0x2 << 124) | rng.getrandbits(124))))
+    return ips
+
+
+def test_intervals_are_sorted_and_disjoint(bundled):
+    """Interval starts are strictly increasing and neighbours never share an id"""
+    _, table = bundled
+    for version in (4, 6):
+        starts = table.starts[version].tolist()
+        assert starts[0] in (0, (0, 0))
+        assert all(starts[i] < starts[i + 1] for i in range(len(starts) - 1))
+        ids = table.set_ids[version]
+        assert (ids[1:] != ids[:-1]).all()
+
+
+def test_batch_search_matches_trie(bundled):
+    """Vectorized batch answers exactly like IPTrie.search for every IP"""
+    trie, table = bundled
+    ips = random_ips(random.Random(11), 5000)
+    for subnet in ["184.51.33.0/24", "23.79.237.0/24", "2600:1f14::/35"]:
+        network = ipaddress.ip_network(subnet)
+        ips += [str(network.network_address), str(network.broadcast_address)]
+        ips += [str(network.network_address - 1), str(network.broadcast_address + 1)]
+    assert table.batch_search(ips) == [trie.search(ip) for ip in ips]
+
+
+def test_batch_search_nested_and_edges():
+    """Nested prefixes resolve to the innermost interval, edges of the space included"""
+    trie = IPTrie()
+    trie.insert("0.0.0.0/0", "Default", [])
+    trie.insert("10.0.0.0/8", "Outer", [])
+    trie.insert("10.1.0.0/16", "Inner", [])
+    trie.insert("255.255.255.255/32", "Last", [])
+    trie.insert("ffff::/16", "V6", [])
+    table = IntervalTable.build(trie)
+    ips = ["9.255.255.255", "10.0.0.0", "10.1.255.255", "10.2.0.0", "255.255.255.255", "ffff::1", "::1"]
+    assert table.batch_search(ips) == [trie.search(ip) for ip in ips]
+    assert table.batch_search([]) == []
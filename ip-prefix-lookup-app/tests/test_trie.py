@@ -31,3 +31,52 @@ def test_trie_lookup_not_found(trie):
     """Test lookup of an IP not in the Trie"""
     result = trie.search("8.8.8.8")
     assert result is None
+
+
+def test_trie_nested_matches(trie):
+    """Test that every enclosing subnet is returned, shortest first"""
+    trie.insert("10.1.0.0/16", "PrivateNetwork", ["Nested"])
+    trie.insert("10.1.2.0/24", "PrivateNetwork", ["Deeper"])
+    result = trie.search("10.1.2.3")
+    assert [r["subnet"] for r in result] == ["10.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24"]
+    assert [r["subnet"] for r in trie.search("10.1.9.9")] == ["10.0.0.0/8", "10.1.0.0/16"]
+
+
+def test_trie_split_on_partial_match(trie):
+    """Test that sibling prefixes sharing leading bits do not shadow each other"""
+    trie.insert("192.168.0.0/24", "Sibling", [])
+    assert trie.search("192.168.0.7")[0]["provider"] == "Sibling"
+    assert trie.search("192.168.1.7")[0]["provider"] == "TestProvider"
+    assert trie.search("192.168.2.7") is None
+
+
+def test_trie_ipv6_separate_root(trie):
+    """Test that IPv6 prefixes use full 128-bit keys and never match IPv4"""
+    trie.insert("2001:db8::/32", "IPv6Provider", ["IPv6"])
+    trie.insert("::/1", "IPv6Provider", ["Wide"])
+    assert [r["subnet"] for r in trie.search("2001:db8::ff00:42")] == ["::/1", "2001:db8::/32"]
+    assert trie.search("2001:db9::1")[0]["subnet"] == "::/1"
+    assert trie.search("10.0.0.1")[0]["provider"] == "PrivateNetwork"
+    assert trie.search("::a00:1") == [{"subnet": "::/1", "provider": "IPv6Provider", "tags": ["Wide"]}]
+
+
+def test_trie_host_route(trie):
+    """Test /32 and /128 host routes"""
+    trie.insert("192.168.1.77/32", "Host", [])
+    trie.insert("2001:db8::1/128", "Host", [])
+    assert len(trie.search("192.168.1.77")) == 2
+    assert len(trie.search("192.168.1.78")) == 1
+    assert trie.search("2001:db8::1")[0]["provider"] == "Host"
+    assert trie.search("2001:db8::2") is None
+
+
+def test_parse_ip():
+    """Test fast address parsing against the ipaddress module"""
+    from app.utils.ip_parsing import parse_ip
+
+    assert parse_ip("10.0.0.1") == (4, 0x0A000001)
+    assert parse_ip("::ffff:1.2.3.4") == (6, 0xFFFF01020304)
+    assert parse_ip("fe80::1%eth0") == (6, 0xFE800000000000000000000000000001)
+    for invalid in ["999.1.1.1", "01.2.3.4", "1.2.3", "", "::g"]:
+        with pytest.raises(ValueError):
+            parse_ip(invalid)
@@ -0,0 +1,56 @@
+import threading
+import pytest
+from app.services import trie_manager
+from app.services.trie_manager import TrieManager
+
+
+@pytest.fixture(autouse=True)
+def loaded():
+    """Start every test from a freshly published generation"""
+    TrieManager.initialize_trie(engine="trie")
+
+
+def test_reload_publishes_new_generation_without_duplicates():
+    """Reloading builds a fresh trie instead of appending to the live one"""
+    before = TrieManager.current()
+    matches = TrieManager.lookup("184.51.33.230")
+    TrieManager.initialize_trie(engine="trie")
+    after = TrieManager.current()
+    assert after.number == before.number + 1
+    assert after.trie is not before.trie
+    assert TrieManager.lookup("184.51.33.230") == matches
+    assert after.trie.node_count == before.trie.node_count
+
+
+def test_failed_reload_keeps_serving_previous_generation(mocker):
+    """A reload that cannot read the data file does not publish an empty trie"""
+    before = TrieManager.current()
+    mocker.patch.object(trie_manager, "load_prefixes", return_value=None)
+    with pytest.raises(RuntimeError):
+        TrieManager.initialize_trie(engine="trie")
+    assert TrieManager.current() is before
+    assert TrieManager.lookup("184.51.33.230") is not None
+
+
+def test_reads_during_reload_see_a_consistent_generation():
+    """Concurrent lookups never fail or see a half-built trie while reloads run"""
+    expected = TrieManager.lookup("184.51.33.230")
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            if TrieManager.lookup("184.51.33.230") != expected:
+                errors.append("inconsistent result")
+            if TrieManager.batch_lookup(["184.51.33.230"] * 100)[0] != expected:
+                errors.append("inconsistent batch")
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(3):
+        TrieManager.initialize_trie(engine="trie")
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []